@@ -1,13 +1,21 @@
 import os
 import logging
-from sqlalchemy import create_engine, Column, Integer, BigInteger, String, DateTime, Text, text
+from typing import Iterable
+from sqlalchemy import bindparam, create_engine, make_url, insert, select, update, Column, Index, Integer, BigInteger, String, DateTime, Text, text
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import StaticPool
 from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# Dialects that support INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {'sqlite': sqlite_insert, 'postgresql': postgresql_insert}
+
 class UserPreferences(Base):
     """Database model for user language preferences"""
     __tablename__ = 'user_preferences'
@@ -56,6 +64,7 @@ class MessageTranslation(Base):
     
     # Composite unique constraint to prevent duplicates
     __table_args__ = (
+        Index('uq_message_translations_chat_message', 'chat_id', 'message_id', unique=True),
         {'sqlite_autoincrement': True} if 'sqlite' in os.getenv('DATABASE_URL', 'sqlite:///bot_data.db') else {}
     )
 
@@ -65,24 +74,76 @@ class DatabaseManager:
     # Class attributes for testing
     engine = None
     session_local = None
+    _translation_upsert = False
     
-    def __init__(self):
-        # Use SQLite for simplicity, can be changed to PostgreSQL for production
-        database_url = os.getenv('DATABASE_URL', 'sqlite:///bot_data.db')
-        if database_url.startswith('postgres://'):
-            database_url = database_url.replace('postgres://', 'postgresql://', 1)
+    # Statements built once and executed with bound parameters
+    _SEL_PREFS = (
+        select(UserPreferences.language1, UserPreferences.language2)
+        .where(UserPreferences.chat_id == bindparam('cid'))
+    )
+    _SEL_ALL_PREFS = select(UserPreferences.chat_id, UserPreferences.language1, UserPreferences.language2)
+    _SEL_STATS = (
+        select(UserStats.translations, UserStats.joined_at, UserStats.last_activity)
+        .where(UserStats.user_id == bindparam('uid'))
+    )
+    _UPD_STATS = (
+        update(UserStats)
+        .where(UserStats.user_id == bindparam('uid'))
+        .values(
+            translations=UserStats.translations + bindparam('delta'),
+            last_activity=bindparam('now')
+        )
+    )
+    _SEL_TRANSLATION = (
+        select(
+            MessageTranslation.original_text,
+            MessageTranslation.translated_text,
+            MessageTranslation.source_language,
+            MessageTranslation.target_language,
+            MessageTranslation.user_id,
+            MessageTranslation.created_at
+        ).where(
+            MessageTranslation.chat_id == bindparam('cid'),
+            MessageTranslation.message_id == bindparam('mid')
+        )
+    )
+    
+    def __init__(self, engine=None):
+        # Managers built on an injected engine stay private and leave the class defaults alone
+        register_defaults = engine is None
+        if engine is None:
+            # Use SQLite for simplicity, can be changed to PostgreSQL for production
+            database_url = os.getenv('DATABASE_URL', 'sqlite:///bot_data.db')
+            if database_url.startswith('postgres://'):
+                database_url = database_url.replace('postgres://', 'postgresql://', 1)
+            
+            engine_kwargs = {}
+            url = make_url(database_url)
+            if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+                # An in-memory database lives on a single connection, so share it across sessions
+                engine_kwargs = {'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}}
+            
+            engine = create_engine(database_url, **engine_kwargs)
         
-        self.engine = create_engine(database_url)
+        self.engine = engine
         self.session_local = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         
         # Set class attributes for testing
-        DatabaseManager.engine = self.engine
-        DatabaseManager.session_local = self.session_local
+        if register_defaults:
+            DatabaseManager.engine = self.engine
+            DatabaseManager.session_local = self.session_local
         
         # Create tables
         self._ensure_proper_schema()
+        self._ensure_message_translation_index()
         logger.info("Database initialized")
     
+    @classmethod
+    def for_testing(cls):
+        """Create a manager on a private in-memory SQLite database, ignoring DATABASE_URL"""
+        engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+        return cls(engine=engine)
+    
     def _ensure_proper_schema(self):
         """Ensure database schema has proper column types for chat_id"""
         try:
@@ -98,6 +159,16 @@ class DatabaseManager:
             # Fallback to normal table creation
             Base.metadata.create_all(bind=self.engine)
     
+    def _ensure_message_translation_index(self):
+        """Add the (chat_id, message_id) unique index to databases created before it existed"""
+        try:
+            for index in MessageTranslation.__table__.indexes:
+                index.create(bind=self.engine, checkfirst=True)
+            self._translation_upsert = self.engine.dialect.name in UPSERT_INSERTS
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not create message translation index, upsert disabled: {e}")
+            self._translation_upsert = False
+    
     def _fix_postgresql_schema(self):
         """Fix PostgreSQL schema to use BIGINT for chat_id and user_id columns"""
         try:
@@ -174,11 +245,16 @@ class DatabaseManager:
             raise RuntimeError("DatabaseManager not initialized")
         return cls.session_local()
     
+    @staticmethod
+    def _get_user_preferences_row(session, chat_id: int):
+        """Select only the language columns for a chat, skipping ORM object hydration"""
+        return session.execute(DatabaseManager._SEL_PREFS, {'cid': chat_id}).first()
+    
     def get_user_preferences(self, chat_id: int) -> tuple[str, str] | None:
         """Get language preferences for a chat"""
         with self.get_session() as session:
             try:
-                prefs = session.query(UserPreferences).filter(UserPreferences.chat_id == chat_id).first()
+                prefs = self._get_user_preferences_row(session, chat_id)
                 if prefs:
                     return (prefs.language1, prefs.language2)
                 return None
@@ -216,11 +292,42 @@ class DatabaseManager:
                 logger.error(f"Error saving preferences for chat {chat_id}: {e}")
                 return False
     
+    def set_user_preferences_bulk(self, items: Iterable[tuple[int, str, str]]) -> bool:
+        """Set language preferences for several chats in a single transaction"""
+        with self.get_session() as session:
+            try:
+                rows = {chat_id: (lang1.lower(), lang2.lower()) for chat_id, lang1, lang2 in items}
+                if not rows:
+                    return True
+                
+                # Update chats that already have preferences
+                existing = session.query(UserPreferences).filter(UserPreferences.chat_id.in_(rows)).all()
+                now = datetime.now(timezone.utc)
+                for prefs in existing:
+                    prefs.language1, prefs.language2 = rows.pop(prefs.chat_id)
+                    prefs.updated_at = now
+                
+                # Create preferences for the remaining chats with a single executemany INSERT
+                if rows:
+                    session.execute(insert(UserPreferences), [
+                        {'chat_id': chat_id, 'language1': lang1, 'language2': lang2}
+                        for chat_id, (lang1, lang2) in rows.items()
+                    ])
+                
+                session.commit()
+                logger.info(f"Saved preferences for {len(existing) + len(rows)} chats")
+                return True
+            
+            except (OSError, ImportError, AttributeError, ValueError) as e:
+                session.rollback()
+                logger.error(f"Error saving preferences in bulk: {e}")
+                return False
+    
     def get_user_stats(self, user_id: int) -> dict | None:
         """Get user statistics"""
         with self.get_session() as session:
             try:
-                stats = session.query(UserStats).filter(UserStats.user_id == user_id).first()
+                stats = session.execute(self._SEL_STATS, {'uid': user_id}).first()
                 if stats:
                     return {
                         'translations': stats.translations,
@@ -234,21 +341,20 @@ class DatabaseManager:
     
     def update_user_stats(self, user_id: int) -> bool:
         """Update user translation statistics"""
+        return self.bump_user_stats(user_id)
+    
+    def bump_user_stats(self, user_id: int, delta: int = 1) -> bool:
+        """Add delta translations to user statistics in a single UPDATE"""
         with self.get_session() as session:
             try:
-                stats = session.query(UserStats).filter(UserStats.user_id == user_id).first()
+                result = session.execute(
+                    self._UPD_STATS,
+                    {'uid': user_id, 'delta': delta, 'now': datetime.now(timezone.utc)}
+                )
                 
-                if stats:
-                    # Update existing stats
-                    stats.translations += 1
-                    stats.last_activity = datetime.now(timezone.utc)
-                else:
+                if result.rowcount == 0:
                     # Create new stats
-                    new_stats = UserStats(
-                        user_id=user_id,
-                        translations=1
-                    )
-                    session.add(new_stats)
+                    session.add(UserStats(user_id=user_id, translations=delta))
                 
                 session.commit()
                 return True
@@ -262,23 +368,60 @@ class DatabaseManager:
         """Get all user preferences (for debugging)"""
         with self.get_session() as session:
             try:
-                prefs = session.query(UserPreferences).all()
-                return {p.chat_id: (p.language1, p.language2) for p in prefs}
+                rows = session.execute(self._SEL_ALL_PREFS)
+                return {chat_id: (language1, language2) for chat_id, language1, language2 in rows}
             except (OSError, ImportError, AttributeError, ValueError) as e:
                 logger.error(f"Error getting all preferences: {e}")
                 return {}
     
+    @staticmethod
+    def _get_language_selection_state(session, chat_id: int) -> dict | None:
+        """Read language selection state for a chat within an open session"""
+        state = session.query(LanguageSelectionState).filter(LanguageSelectionState.chat_id == chat_id).first()
+        if state:
+            return {
+                'step': state.step,
+                'first_lang': state.first_lang
+            }
+        return None
+    
+    @staticmethod
+    def _set_language_selection_state(session, chat_id: int, step: str, first_lang: str = None):
+        """Write language selection state within an open session, flushing without committing"""
+        # Check if state already exists
+        existing = session.query(LanguageSelectionState).filter(LanguageSelectionState.chat_id == chat_id).first()
+        
+        if existing:
+            # Update existing state
+            existing.step = step
+            existing.first_lang = first_lang
+            existing.updated_at = datetime.now(timezone.utc)
+        else:
+            # Create new state
+            new_state = LanguageSelectionState(
+                chat_id=chat_id,
+                step=step,
+                first_lang=first_lang
+            )
+            session.add(new_state)
+        
+        session.flush()
+    
+    @staticmethod
+    def _clear_language_selection_state(session, chat_id: int) -> bool:
+        """Delete language selection state within an open session, returning whether a row existed"""
+        state = session.query(LanguageSelectionState).filter(LanguageSelectionState.chat_id == chat_id).first()
+        if state:
+            session.delete(state)
+            session.flush()
+            return True
+        return False
+    
     def get_language_selection_state(self, chat_id: int) -> dict | None:
         """Get language selection state for a chat"""
         with self.get_session() as session:
             try:
-                state = session.query(LanguageSelectionState).filter(LanguageSelectionState.chat_id == chat_id).first()
-                if state:
-                    return {
-                        'step': state.step,
-                        'first_lang': state.first_lang
-                    }
-                return None
+                return self._get_language_selection_state(session, chat_id)
             except (OSError, ImportError, AttributeError, ValueError) as e:
                 logger.error(f"Error getting selection state for chat {chat_id}: {e}")
                 return None
@@ -287,23 +430,7 @@ class DatabaseManager:
         """Set language selection state for a chat"""
         with self.get_session() as session:
             try:
-                # Check if state already exists
-                existing = session.query(LanguageSelectionState).filter(LanguageSelectionState.chat_id == chat_id).first()
-                
-                if existing:
-                    # Update existing state
-                    existing.step = step
-                    existing.first_lang = first_lang
-                    existing.updated_at = datetime.now(timezone.utc)
-                else:
-                    # Create new state
-                    new_state = LanguageSelectionState(
-                        chat_id=chat_id,
-                        step=step,
-                        first_lang=first_lang
-                    )
-                    session.add(new_state)
-                
+                self._set_language_selection_state(session, chat_id, step, first_lang)
                 session.commit()
                 logger.info(f"Saved selection state for chat {chat_id}: step={step}, first_lang={first_lang}")
                 return True
@@ -317,9 +444,7 @@ class DatabaseManager:
         """Clear language selection state for a chat"""
         with self.get_session() as session:
             try:
-                state = session.query(LanguageSelectionState).filter(LanguageSelectionState.chat_id == chat_id).first()
-                if state:
-                    session.delete(state)
+                if self._clear_language_selection_state(session, chat_id):
                     session.commit()
                     logger.info(f"Cleared selection state for chat {chat_id}")
                 return True
@@ -334,6 +459,30 @@ class DatabaseManager:
         """Store a message translation for later retrieval on edit"""
         with self.get_session() as session:
             try:
+                if self._translation_upsert:
+                    # Insert or update in a single statement
+                    stmt = UPSERT_INSERTS[self.engine.dialect.name](MessageTranslation).values(
+                        chat_id=chat_id,
+                        message_id=message_id,
+                        user_id=user_id,
+                        original_text=original_text,
+                        translated_text=translated_text,
+                        source_language=source_language,
+                        target_language=target_language
+                    )
+                    session.execute(stmt.on_conflict_do_update(
+                        index_elements=[MessageTranslation.chat_id, MessageTranslation.message_id],
+                        set_={
+                            'original_text': stmt.excluded.original_text,
+                            'translated_text': stmt.excluded.translated_text,
+                            'source_language': stmt.excluded.source_language,
+                            'target_language': stmt.excluded.target_language
+                        }
+                    ))
+                    session.commit()
+                    logger.info(f"Stored translation for message {message_id} in chat {chat_id}")
+                    return True
+                
                 # Check if translation already exists for this message
                 existing = session.query(MessageTranslation).filter(
                     MessageTranslation.chat_id == chat_id,
@@ -372,9 +521,8 @@ class DatabaseManager:
         """Get stored translation for a specific message"""
         with self.get_session() as session:
             try:
-                translation = session.query(MessageTranslation).filter(
-                    MessageTranslation.chat_id == chat_id,
-                    MessageTranslation.message_id == message_id
+                translation = session.execute(
+                    self._SEL_TRANSLATION, {'cid': chat_id, 'mid': message_id}
                 ).first()
                 
                 if translation:
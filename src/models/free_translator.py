@@ -53,6 +53,13 @@ class FreeTranslator:
             'zh-sg': 'zh',  # Singapore Chinese
         }
     
+    @staticmethod
+    def _resolve(result):
+        """Return a googletrans result, running an event loop only for the async client"""
+        if asyncio.iscoroutine(result):
+            return asyncio.run(result)
+        return result
+    
     def translate_text(self, text: str, target_lang: str, source_lang: str = 'auto') -> Optional[str]:
         """Translate text using Google Translate"""
         
@@ -83,11 +90,11 @@ class FreeTranslator:
             # Clean text - remove extra whitespace
             clean_text = ' '.join(text.split())
             
-            # Run the async translation
+            # Run the translation (googletrans 4.x is async)
             if source_lang == 'auto':
-                result = asyncio.run(translator.translate(clean_text, dest=target_lang))
+                result = self._resolve(translator.translate(clean_text, dest=target_lang))
             else:
-                result = asyncio.run(translator.translate(clean_text, src=source_lang, dest=target_lang))
+                result = self._resolve(translator.translate(clean_text, src=source_lang, dest=target_lang))
             
             translated_text = result.text
             logger.info(f"Google Translate result: {translated_text[:100]}...")
@@ -122,7 +129,7 @@ class FreeTranslator:
                 return 'unknown'
             
             # Method 1: Google Translate detection
-            detection = asyncio.run(translator.detect(clean_text))
+            detection = self._resolve(translator.detect(clean_text))
             detected_code = detection.lang
             confidence = getattr(detection, 'confidence', 0.0)
             
@@ -198,7 +205,7 @@ class FreeTranslator:
             for candidate in allowed_set:
                 # Translate to the other allowed language or to English as a neutral target if only one
                 dest_lang = next((l for l in allowed_set if l != candidate), 'en')
-                result = asyncio.run(translator.translate(text, dest=dest_lang))
+                result = self._resolve(translator.translate(text, dest=dest_lang))
                 src_lang = self.language_mapping.get(getattr(result, 'src', ''), getattr(result, 'src', ''))
                 if src_lang in allowed_set:
                     candidates[src_lang] = candidates.get(src_lang, 0) + 1
@@ -1,3 +1,6 @@
+from functools import lru_cache
+
+
 class LanguageDetector:
     """Language detection and management"""
     
@@ -16,9 +19,13 @@ class LanguageDetector:
         'gu': 'Gujarati', 'kn': 'Kannada', 'ml': 'Malayalam', 'si': 'Sinhala'
     }
     
+    # Lowercase codes accepted by is_valid_language
+    _VALID_CODES = frozenset(SUPPORTED_LANGUAGES)
+    
     @classmethod
+    @lru_cache(maxsize=None)
     def get_language_list(cls) -> str:
-        """Get formatted list of supported languages"""
+        """Get formatted list of supported languages (built once, SUPPORTED_LANGUAGES is fixed)"""
         langs = []
         for code, name in sorted(cls.SUPPORTED_LANGUAGES.items()):
             langs.append(f"`{code}` - {name}")
@@ -29,4 +36,4 @@ class LanguageDetector:
         """Check if language code is supported"""
         if not lang_code or not isinstance(lang_code, str):
             return False
-        return lang_code.strip().lower() in cls.SUPPORTED_LANGUAGES 
\ No newline at end of file
+        return lang_code.strip().lower() in cls._VALID_CODES 
\ No newline at end of file
@@ -2,6 +2,7 @@ import os
 import logging
 import requests
 import time
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime
 
@@ -187,8 +188,14 @@ class TelegramBot:
         """Update user translation statistics in database"""
         return self.db.update_user_stats(user_id)
     
-    def _create_language_keyboard(self, exclude_lang: str = None) -> List[List[tuple]]:
-        """Create keyboard with all available languages"""
+    def _create_language_keyboard(self, exclude_lang: str = None) -> Tuple[Tuple[Tuple[str, str], ...], ...]:
+        """Create keyboard with all available languages (cached and read-only)"""
+        return self._build_language_keyboard(exclude_lang)
+    
+    @classmethod
+    @lru_cache(maxsize=len(LanguageDetector.SUPPORTED_LANGUAGES) + 1)
+    def _build_language_keyboard(cls, exclude_lang: str = None) -> Tuple[Tuple[Tuple[str, str], ...], ...]:
+        """Build the language keyboard once per excluded language, as tuples so the cached copy can't be changed"""
         languages = list(LanguageDetector.SUPPORTED_LANGUAGES.items())
         
         # Filter out excluded language if specified
@@ -200,21 +207,22 @@ class TelegramBot:
         row = []
         for code, name in languages:
             # Create button text with flag emoji and language name
-            flag_emoji = self._get_language_flag(code)
+            flag_emoji = cls._get_language_flag(code)
             button_text = f"{flag_emoji} {name}"
             row.append((button_text, code))  # (display_text, callback_data)
             
             if len(row) == 3:
-                keyboard.append(row)
+                keyboard.append(tuple(row))
                 row = []
         
         # Add remaining languages
         if row:
-            keyboard.append(row)
+            keyboard.append(tuple(row))
         
-        return keyboard
+        return tuple(keyboard)
     
-    def _get_language_flag(self, lang_code: str) -> str:
+    @staticmethod
+    def _get_language_flag(lang_code: str) -> str:
         """Get flag emoji for language code"""
         flag_map = {
             'th': '\U0001F1F9\U0001F1ED', 'ru': '\U0001F1F7\U0001F1FA', 'zh': '\U0001F1E8\U0001F1F3', 'en': '\U0001F1FA\U0001F1F8', 'es': '\U0001F1EA\U0001F1F8', 'fr': '\U0001F1EB\U0001F1F7',
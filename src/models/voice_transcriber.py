@@ -1,9 +1,15 @@
 import os
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import tempfile
-from typing import Optional, Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Dict, List, Tuple
 from urllib.parse import urlparse
 import json
 from .transcription_result import TranscriptionResult, TranscriptionQualityAnalyzer
@@ -30,10 +36,34 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+
+def _create_http_session() -> requests.Session:
+    """Create a keep-alive session for Telegram file downloads and Whisper uploads"""
+    session = requests.Session()
+    # Only idempotent requests and failed connects are retried, so uploads are never sent twice.
+    # Retry-After is ignored so a 429/503 cannot stall the webhook thread for as long as the server asks
+    retries = Retry(total=2, backoff_factor=0.1, respect_retry_after_header=False)
+    session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retries))
+    return session
+
+
+# Shared by every transcriber so connections are pooled across voice messages
+_HTTP_SESSION = _create_http_session()
+
 class VoiceTranscriber:
     """Voice transcription service with AssemblyAI and Google Speech-to-Text as primary services"""
     
-    def __init__(self):
+    # Number of recent transcriptions kept, keyed by audio hash
+    TRANSCRIPTION_CACHE_SIZE = 256
+    
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session if session is not None else _HTTP_SESSION
+        self._transcription_cache: "OrderedDict[Tuple[str, float], TranscriptionResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Opt-in: call all services at once, trading extra API usage for lower fallback latency
+        self.parallel_services = os.getenv('VOICE_TRANSCRIPTION_PARALLEL', '').lower() == 'true'
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
         self.rate_limits = {
             'assemblyai': {'last_request': 0, 'min_interval': 1},  # 1 second between requests
             'google_speech': {'last_request': 0, 'min_interval': 1},  # 1 second between requests
@@ -48,7 +78,7 @@ class VoiceTranscriber:
         
         # Initialize Whisper transcriber
         if WHISPER_AVAILABLE:
-            self.whisper_transcriber = WhisperTranscriber()
+            self.whisper_transcriber = WhisperTranscriber(session=self.session)
         else:
             self.whisper_transcriber = None
         
@@ -119,7 +149,7 @@ class VoiceTranscriber:
             
             # Get file info
             file_info_url = f"https://api.telegram.org/bot{token}/getFile"
-            file_info_response = requests.post(file_info_url, json={'file_id': file_id}, timeout=10)
+            file_info_response = self.session.post(file_info_url, json={'file_id': file_id}, timeout=10)
             
             if file_info_response.status_code != 200:
                 logger.error(f"Failed to get file info: {file_info_response.text}")
@@ -132,7 +162,7 @@ class VoiceTranscriber:
             
             # Download the file
             file_url = f"https://api.telegram.org/file/bot{token}/{file_info['result']['file_path']}"
-            file_response = requests.get(file_url, timeout=30)
+            file_response = self.session.get(file_url, timeout=30)
             
             if file_response.status_code != 200:
                 logger.error(f"Failed to download file: {file_response.status_code}")
@@ -314,64 +344,54 @@ class VoiceTranscriber:
         
         logger.info(f"Downloaded voice file, size: {len(audio_data)} bytes")
         
+        # Identical audio (e.g. a forwarded voice message) gets the same transcription
+        cache_key = (hashlib.blake2b(audio_data, digest_size=16).hexdigest(), confidence_threshold)
+        cached = self._get_cached_transcription(cache_key)
+        if cached:
+            logger.info(f"[INFO] Using cached {cached.service} transcription")
+            return cached
+        
+        result = self._transcribe_audio_data(audio_data, confidence_threshold)
+        # A low-confidence fallback is not cached, so resending the audio can reach a better service
+        if result and result.is_high_confidence(confidence_threshold):
+            self._cache_transcription(cache_key, result)
+        return result
+    
+    def _get_cached_transcription(self, cache_key: Tuple[str, float]) -> Optional[TranscriptionResult]:
+        """Look up a previous transcription of the same audio, marking it recently used"""
+        with self._cache_lock:
+            result = self._transcription_cache.get(cache_key)
+            if result:
+                self._transcription_cache.move_to_end(cache_key)
+            return result
+    
+    def _cache_transcription(self, cache_key: Tuple[str, float], result: TranscriptionResult) -> None:
+        """Remember a transcription, evicting the least recently used beyond the cache size"""
+        with self._cache_lock:
+            self._transcription_cache[cache_key] = result
+            self._transcription_cache.move_to_end(cache_key)
+            if len(self._transcription_cache) > self.TRANSCRIPTION_CACHE_SIZE:
+                self._transcription_cache.popitem(last=False)
+    
+    def _transcribe_audio_data(self, audio_data: bytes, confidence_threshold: float) -> Optional[TranscriptionResult]:
+        """Run the service fallback chain on downloaded audio"""
         # Save to temporary file for services that need file paths
         temp_audio_path = self._save_audio_to_temp_file(audio_data)
         if not temp_audio_path:
             logger.error("Failed to save audio to temp file")
             return None
         
+        services = self._transcription_services()
+        parallel = self.parallel_services and len(services) > 1
         try:
-            all_results = []
-            
-            # Step 1: Try Whisper API first (best for Hebrew and many languages)
-            if self.services_available.get('whisper', False):
-                logger.info("[INFO] Trying Whisper API transcription...")
-                try:
-                    result = self.whisper_transcriber.transcribe_audio(temp_audio_path)
-                    if result:
-                        all_results.append(result)
-                        logger.info(f"[INFO] Whisper confidence: {result.confidence:.3f}")
-                        
-                        # If Whisper has high confidence, we can stop here
-                        if result.is_high_confidence(confidence_threshold):
-                            logger.info(f"[INFO] Whisper achieved high confidence ({result.confidence:.3f}), using result")
-                            return result
-                except Exception as e:
-                    logger.warning(f"[WARN] Whisper failed: {e}")
-            
-            # Step 2: Try AssemblyAI (good fallback)
-            if self.services_available.get('assemblyai', False):
-                logger.info("[INFO] Trying AssemblyAI transcription...")
-                try:
-                    result = self._transcribe_with_assemblyai(temp_audio_path)
-                    if result:
-                        all_results.append(result)
-                        logger.info(f"[INFO] AssemblyAI confidence: {result.confidence:.3f}")
-                        
-                        # If AssemblyAI has high confidence, we can stop here
-                        if result.is_high_confidence(confidence_threshold):
-                            logger.info(f"[INFO] AssemblyAI achieved high confidence ({result.confidence:.3f}), using result")
-                            return result
-                except Exception as e:
-                    logger.warning(f"[WARN] AssemblyAI failed: {e}")
-            
-            # Step 3: Try Google Speech-to-Text (final fallback)
-            if self.services_available.get('google_speech', False):
-                logger.info("[INFO] Trying Google Speech-to-Text...")
-                try:
-                    result = self._transcribe_with_google_speech(temp_audio_path)
-                    if result:
-                        all_results.append(result)
-                        logger.info(f"[INFO] Google Speech confidence: {result.confidence:.3f}")
-                        
-                        # If Google has high confidence, we can stop here
-                        if result.is_high_confidence(confidence_threshold):
-                            logger.info(f"[INFO] Google Speech achieved high confidence ({result.confidence:.3f}), using result")
-                            return result
-                except Exception as e:
-                    logger.warning(f"[WARN] Google Speech-to-Text failed: {e}")
+            if parallel:
+                all_results, confident = self._run_services_in_parallel(services, temp_audio_path, confidence_threshold)
+            else:
+                all_results, confident = self._run_services_in_order(services, temp_audio_path, confidence_threshold)
+            if confident:
+                return confident
             
-            # Step 4: Compare all results and choose the best one
+            # No service was confident: compare all results and choose the best one
             if all_results:
                 logger.info(f"[INFO] Comparing {len(all_results)} transcription results...")
                 best_result = TranscriptionQualityAnalyzer.compare_transcriptions(all_results)
@@ -382,11 +402,92 @@ class VoiceTranscriber:
             return None
             
         finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_audio_path)
-            except (OSError, ImportError, AttributeError, ValueError) as e:
-                logger.warning(f"Failed to clean up temp file: {e}")
+            # In parallel mode the last service to finish removes the file instead
+            if not parallel:
+                self._remove_temp_file(temp_audio_path)
+    
+    @staticmethod
+    def _remove_temp_file(temp_audio_path: str) -> None:
+        """Clean up a temporary audio file"""
+        try:
+            os.unlink(temp_audio_path)
+        except (OSError, ImportError, AttributeError, ValueError) as e:
+            logger.warning(f"Failed to clean up temp file: {e}")
+    
+    def _transcription_services(self) -> List[Tuple[str, Callable[[str], Optional[TranscriptionResult]]]]:
+        """Available services in fallback order: Whisper (best for Hebrew and many languages), AssemblyAI, then Google"""
+        services = []
+        if self.services_available.get('whisper', False):
+            services.append(('Whisper', self.whisper_transcriber.transcribe_audio))
+        if self.services_available.get('assemblyai', False):
+            services.append(('AssemblyAI', self._transcribe_with_assemblyai))
+        if self.services_available.get('google_speech', False):
+            services.append(('Google Speech', self._transcribe_with_google_speech))
+        return services
+    
+    @staticmethod
+    def _try_service(name: str, transcribe: Callable[[str], Optional[TranscriptionResult]], audio_path: str) -> Optional[TranscriptionResult]:
+        """Run one service, treating any error as no result"""
+        logger.info(f"[INFO] Trying {name} transcription...")
+        try:
+            result = transcribe(audio_path)
+        except Exception as e:
+            logger.warning(f"[WARN] {name} failed: {e}")
+            return None
+        if result:
+            logger.info(f"[INFO] {name} confidence: {result.confidence:.3f}")
+        return result
+    
+    def _run_services_in_order(self, services, audio_path: str, confidence_threshold: float) -> Tuple[List[TranscriptionResult], Optional[TranscriptionResult]]:
+        """Try services one at a time, stopping at the first confident result"""
+        all_results = []
+        for name, transcribe in services:
+            result = self._try_service(name, transcribe, audio_path)
+            if result:
+                all_results.append(result)
+                if result.is_high_confidence(confidence_threshold):
+                    logger.info(f"[INFO] {name} achieved high confidence ({result.confidence:.3f}), using result")
+                    return all_results, result
+        return all_results, None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Thread pool for parallel transcription, created on first use and reused for every message"""
+        with self._executor_lock:
+            if self._executor is None:
+                # One worker per service
+                self._executor = ThreadPoolExecutor(max_workers=len(self.services_available), thread_name_prefix='transcribe')
+            return self._executor
+    
+    def _run_services_in_parallel(self, services, audio_path: str, confidence_threshold: float) -> Tuple[List[TranscriptionResult], Optional[TranscriptionResult]]:
+        """Start every service at once but pick results in fallback order, so the outcome matches the sequential chain"""
+        executor = self._get_executor()
+        # Lower-priority services may still be uploading the audio after a confident
+        # result is returned, so whichever service finishes last removes the file
+        remaining = [len(services)]
+        remaining_lock = threading.Lock()
+        
+        def _service_done(_future):
+            with remaining_lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._remove_temp_file(audio_path)
+        
+        futures = []
+        for name, transcribe in services:
+            future = executor.submit(self._try_service, name, transcribe, audio_path)
+            future.add_done_callback(_service_done)
+            futures.append((name, future))
+        
+        all_results = []
+        for name, future in futures:
+            result = future.result()
+            if result:
+                all_results.append(result)
+                if result.is_high_confidence(confidence_threshold):
+                    logger.info(f"[INFO] {name} achieved high confidence ({result.confidence:.3f}), using result")
+                    return all_results, result
+        return all_results, None
     
     def get_service_status(self) -> Dict[str, Dict]:
         """Get status of all transcription services"""
@@ -11,7 +11,8 @@ logger = logging.getLogger(__name__)
 class WhisperTranscriber:
     """Whisper API transcription service"""
     
-    def __init__(self):
+    def __init__(self, session: Optional[requests.Session] = None):
+        self.session = session if session is not None else requests.Session()
         self.api_key = os.getenv('OPENAI_API_KEY')
         self.base_url = "https://api.openai.com/v1/audio/transcriptions"
         self.available = bool(self.api_key)
@@ -38,7 +39,7 @@ class WhisperTranscriber:
                 }
                 
                 logger.info("[INFO] Sending audio to Whisper API...")
-                response = requests.post(
+                response = self.session.post(
                     self.base_url,
                     files=files,
                     data=data,
@@ -1,53 +1,81 @@
-import os
 import pytest
-import tempfile
-from src.models.database import DatabaseManager, Base
-from sqlalchemy import create_engine
+
+from src.models.database import DatabaseManager
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-@pytest.fixture(scope="session")
-def test_database():
-    """Create a test database for the test session"""
-    # Use in-memory SQLite for tests
-    engine = create_engine("sqlite:///:memory:")
-    Base.metadata.create_all(engine)
-    
-    # Create session factory
-    testing_session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Override the database manager's engine
-    original_engine = DatabaseManager.engine
-    original_session_local = DatabaseManager.session_local
-    DatabaseManager.engine = engine
-    DatabaseManager.session_local = testing_session_local
+
+# Nothing in the test database needs to survive a crash, so keep journal,
+# temp tables and sort files in memory and skip sync work on commit
+SQLITE_TEST_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """Prepare each SQLite connection for the disposable test database"""
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs nest inside the test transaction
+    dbapi_connection.isolation_level = None
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_TEST_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
+def _begin_sqlite_transaction(connection):
+    """Start the outer transaction explicitly (pysqlite would defer it)"""
+    connection.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="module")
+def engine():
+    """Create one in-memory SQLite database per module (and per xdist worker)"""
+    engine = create_engine(
+        'sqlite:///:memory:',
+        poolclass=StaticPool,
+        connect_args={'check_same_thread': False}
+    )
+    event.listen(engine, "connect", _configure_sqlite_connection)
+    event.listen(engine, "begin", _begin_sqlite_transaction)
     
     yield engine
     
-    # Restore original engine
-    DatabaseManager.engine = original_engine
-    DatabaseManager.session_local = original_session_local
-
-@pytest.fixture(autouse=True)
-def setup_test_env(test_database):
-    """Set up test environment before each test"""
-    # Set test environment variables
-    os.environ['FLASK_ENV'] = 'testing'
-    os.environ['DATABASE_URL'] = 'sqlite:///:memory:'
+    engine.dispose()
+
+
+@pytest.fixture(scope="module")
+def shared_db_manager(engine):
+    """Build the DatabaseManager once directly on the test engine (it creates the schema)"""
+    return DatabaseManager(engine=engine)
+
+
+@pytest.fixture
+def db_manager(engine, shared_db_manager):
+    """Give each test an isolated view of the database inside a rolled-back transaction"""
+    connection = engine.connect()
+    transaction = connection.begin()
+    
+    # Sessions commit to a SAVEPOINT, so the outer transaction stays open
+    # and rolling it back resets every table without DELETE statements
+    shared_db_manager.session_local = sessionmaker(
+        autocommit=False, autoflush=False, bind=connection,
+        join_transaction_mode="create_savepoint"
+    )
     
-    yield
+    yield shared_db_manager
     
-    # Clean up after each test
-    with DatabaseManager.get_session_class() as session:
-        for table in reversed(Base.metadata.sorted_tables):
-            session.execute(table.delete())
-        session.commit()
+    # Discard everything the test wrote
+    transaction.rollback()
+    connection.close()
 
-@pytest.fixture
-def mock_telegram_token():
-    """Mock Telegram bot token for tests"""
-    return "test_token_12345"
 
-@pytest.fixture
-def mock_webhook_url():
-    """Mock webhook URL for tests"""
-    return "https://example.com/webhook"
+@pytest.fixture(scope="session", autouse=True)
+def test_environment():
+    """Set test environment variables once for the whole session"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('FLASK_ENV', 'testing')
+        mp.setenv('DATABASE_URL', 'sqlite:///:memory:')
+        yield
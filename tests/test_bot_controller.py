@@ -1,17 +1,7 @@
 import unittest
-from unittest.mock import patch, MagicMock, Mock
-import sys
-import os
-import json
 from datetime import datetime
 
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
-
-from src.controllers.bot_controller import (
-    home, webhook, set_webhook, manual_translate, get_stats,
-    BotSingleton, get_bot
-)
+from src.controllers.bot_controller import home, BotSingleton
 from src.main import app
 
 
@@ -1,29 +1,38 @@
 import unittest
-from unittest.mock import patch, MagicMock
 import sys
-import os
-import asyncio
-
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import types
 
 # Mock googletrans before importing FreeTranslator
-async def mock_translate(self, text, dest=None, src=None):
-    return type('MockResult', (), {'text': f"Translated: {text}"})()
+class _MockTranslateResult:
+    """Translation result returned by the mocked translator"""
+    __slots__ = ('text',)
+
+
+class _MockDetectResult:
+    """Detection result returned by the mocked translator"""
+    __slots__ = ('lang',)
 
-async def mock_detect(self, text):
-    if text and isinstance(text, str):
-        return type('MockDetect', (), {'lang': 'en'})()
-    else:
-        raise ValueError("Invalid input")
 
-sys.modules['googletrans'] = type('MockModule', (), {
-    'Translator': type('MockTranslator', (), {
-        '__init__': lambda self: None,
-        'translate': mock_translate,
-        'detect': mock_detect
-    })
-})
+class _MockTranslator:
+    """Synchronous stand-in for googletrans.Translator"""
+    
+    def translate(self, text, dest=None, src=None):
+        result = _MockTranslateResult()
+        result.text = f"Translated: {text}"
+        return result
+    
+    def detect(self, text):
+        if text and isinstance(text, str):
+            result = _MockDetectResult()
+            result.lang = 'en'
+            return result
+        else:
+            raise ValueError("Invalid input")
+
+
+_mock_googletrans = types.ModuleType('googletrans')
+_mock_googletrans.Translator = _MockTranslator
+sys.modules['googletrans'] = _mock_googletrans
 
 from models.free_translator import FreeTranslator
 
@@ -31,15 +40,24 @@ from models.free_translator import FreeTranslator
 class TestFreeTranslator(unittest.TestCase):
     """Test cases for FreeTranslator class"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        self.translator = FreeTranslator()
+    @classmethod
+    def setUpClass(cls):
+        """Set up a shared translator (it holds only read-only lookup tables)"""
+        cls.translator = FreeTranslator()
     
     def test_translator_initialization(self):
         """Test that translator initializes without errors"""
         translator = FreeTranslator()
         self.assertIsInstance(translator, FreeTranslator)
     
+    def test_resolve_sync_and_async_results(self):
+        """Test that results are returned as-is and coroutines are awaited"""
+        async def async_result():
+            return "async"
+        
+        self.assertEqual(FreeTranslator._resolve("sync"), "sync")
+        self.assertEqual(FreeTranslator._resolve(async_result()), "async")
+    
     def test_translate_text_success(self):
         """Test successful translation"""
         # Test translation with mocked googletrans
@@ -1,13 +1,14 @@
 import unittest
-from unittest.mock import patch
-import sys
-import os
-
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pytest
 
 from models.language_detector import LanguageDetector
 
+# (code, CODE, Code, name) rows computed once for the per-language checks
+_LANG_ITEMS = tuple(
+    (code, code.upper(), code.title(), name)
+    for code, name in LanguageDetector.SUPPORTED_LANGUAGES.items()
+)
+
 
 class TestLanguageDetector(unittest.TestCase):
     """Test cases for LanguageDetector class"""
@@ -21,14 +22,19 @@ class TestLanguageDetector(unittest.TestCase):
         self.assertGreater(len(LanguageDetector.SUPPORTED_LANGUAGES), 0)
         self.assertIsInstance(LanguageDetector.SUPPORTED_LANGUAGES, dict)
     
-    def test_supported_languages_format(self):
-        """Test that all language codes are lowercase strings"""
-        for code, name in LanguageDetector.SUPPORTED_LANGUAGES.items():
-            self.assertIsInstance(code, str)
-            self.assertIsInstance(name, str)
-            self.assertEqual(code, code.lower())
-            self.assertGreater(len(code), 0)
-            self.assertGreater(len(name), 0)
+    def test_supported_languages_shape(self):
+        """Test code and name format for every supported language in a single pass"""
+        for code, _, _, name in _LANG_ITEMS:
+            with self.subTest(code=code):
+                # Codes are exactly 2 lowercase letters
+                self.assertIsInstance(code, str)
+                self.assertEqual(len(code), 2)
+                self.assertTrue(code.isalpha())
+                self.assertEqual(code, code.lower())
+                # Names are non-empty with no leading/trailing whitespace
+                self.assertIsInstance(name, str)
+                self.assertGreater(len(name), 0)
+                self.assertEqual(name, name.strip())
     
     def test_get_language_list_format(self):
         """Test that get_language_list returns formatted string"""
@@ -46,22 +52,8 @@ class TestLanguageDetector(unittest.TestCase):
     def test_get_language_list_contains_all_languages(self):
         """Test that get_language_list contains all supported languages"""
         lang_list = LanguageDetector.get_language_list()
-        for code, name in LanguageDetector.SUPPORTED_LANGUAGES.items():
-            self.assertIn(f"`{code}` - {name}", lang_list)
-    
-    def test_is_valid_language_valid_codes(self):
-        """Test is_valid_language with valid language codes"""
-        for code in LanguageDetector.SUPPORTED_LANGUAGES.keys():
-            self.assertTrue(LanguageDetector.is_valid_language(code))
-            # Test case insensitivity
-            self.assertTrue(LanguageDetector.is_valid_language(code.upper()))
-            self.assertTrue(LanguageDetector.is_valid_language(code.title()))
-    
-    def test_is_valid_language_invalid_codes(self):
-        """Test is_valid_language with invalid language codes"""
-        invalid_codes = ['', 'invalid', 'xx', '123', 'en-us', 'EN_US']
-        for code in invalid_codes:
-            self.assertFalse(LanguageDetector.is_valid_language(code))
+        expected_lines = {f"`{code}` - {name}" for code, _, _, name in _LANG_ITEMS}
+        self.assertLessEqual(expected_lines, set(lang_list.split('\n')))
     
     def test_is_valid_language_edge_cases(self):
         """Test is_valid_language with edge cases"""
@@ -73,15 +65,8 @@ class TestLanguageDetector(unittest.TestCase):
     
     def test_common_languages_present(self):
         """Test that common languages are present in supported languages"""
-        common_languages = ['en', 'es', 'fr', 'de', 'ru', 'zh', 'ja', 'ko']
-        for lang in common_languages:
-            self.assertIn(lang, LanguageDetector.SUPPORTED_LANGUAGES)
-    
-    def test_language_names_not_empty(self):
-        """Test that language names are not empty strings"""
-        for code, name in LanguageDetector.SUPPORTED_LANGUAGES.items():
-            self.assertIsInstance(name, str)
-            self.assertGreater(len(name.strip()), 0)
+        common_languages = {'en', 'es', 'fr', 'de', 'ru', 'zh', 'ja', 'ko'}
+        self.assertLessEqual(common_languages, set(LanguageDetector.SUPPORTED_LANGUAGES))
     
     def test_no_duplicate_language_codes(self):
         """Test that there are no duplicate language codes"""
@@ -95,30 +80,13 @@ class TestLanguageDetector(unittest.TestCase):
         unique_names = set(names)
         self.assertEqual(len(names), len(unique_names))
     
-    def test_language_codes_format_consistency(self):
-        """Test that all language codes follow consistent format"""
-        for code in LanguageDetector.SUPPORTED_LANGUAGES.keys():
-            # Should be exactly 2 characters
-            self.assertEqual(len(code), 2)
-            # Should be alphabetic
-            self.assertTrue(code.isalpha())
-            # Should be lowercase
-            self.assertEqual(code, code.lower())
-    
-    def test_language_names_format_consistency(self):
-        """Test that all language names follow consistent format"""
-        for name in LanguageDetector.SUPPORTED_LANGUAGES.values():
-            # Should be title case or proper format
-            self.assertIsInstance(name, str)
-            self.assertGreater(len(name), 0)
-            # Should not have leading/trailing whitespace
-            self.assertEqual(name, name.strip())
-    
     def test_get_language_list_ordering(self):
         """Test that get_language_list maintains consistent ordering"""
         lang_list1 = LanguageDetector.get_language_list()
         lang_list2 = LanguageDetector.get_language_list()
         self.assertEqual(lang_list1, lang_list2)
+        # The list is memoized, so repeated calls return the same object
+        self.assertIs(lang_list1, lang_list2)
     
     def test_is_valid_language_whitespace_handling(self):
         """Test that whitespace is handled correctly in language validation"""
@@ -131,13 +99,6 @@ class TestLanguageDetector(unittest.TestCase):
         self.assertFalse(LanguageDetector.is_valid_language(' invalid '))
         self.assertFalse(LanguageDetector.is_valid_language('\txx\t'))
     
-    def test_is_valid_language_special_characters(self):
-        """Test that special characters are handled correctly"""
-        special_chars = ['!', '@', '#', '$', '%', '^', '&', '*', '(', ')', '-', '_', '+', '=']
-        for char in special_chars:
-            self.assertFalse(LanguageDetector.is_valid_language(f'en{char}'))
-            self.assertFalse(LanguageDetector.is_valid_language(f'{char}en'))
-    
     def test_supported_languages_immutability(self):
         """Test that SUPPORTED_LANGUAGES is not accidentally modified"""
         original_languages = dict(LanguageDetector.SUPPORTED_LANGUAGES)
@@ -166,5 +127,31 @@ class TestLanguageDetector(unittest.TestCase):
             )
 
 
+@pytest.mark.parametrize(
+    "code, upper, title",
+    [(code, upper, title) for code, upper, title, _ in _LANG_ITEMS],
+    ids=[code for code, _, _, _ in _LANG_ITEMS]
+)
+def test_is_valid_language_valid_codes(code, upper, title):
+    """Test is_valid_language with valid language codes"""
+    assert LanguageDetector.is_valid_language(code)
+    # Test case insensitivity
+    assert LanguageDetector.is_valid_language(upper)
+    assert LanguageDetector.is_valid_language(title)
+
+
+@pytest.mark.parametrize("code", ['', 'invalid', 'xx', '123', 'en-us', 'EN_US'])
+def test_is_valid_language_invalid_codes(code):
+    """Test is_valid_language with invalid language codes"""
+    assert not LanguageDetector.is_valid_language(code)
+
+
+@pytest.mark.parametrize("char", ['!', '@', '#', '$', '%', '^', '&', '*', '(', ')', '-', '_', '+', '='])
+def test_is_valid_language_special_characters(char):
+    """Test that special characters are handled correctly"""
+    assert not LanguageDetector.is_valid_language(f'en{char}')
+    assert not LanguageDetector.is_valid_language(f'{char}en')
+
+
 if __name__ == '__main__':
-    unittest.main()
+    pytest.main([__file__])
@@ -1,252 +1,283 @@
-import unittest
-from unittest.mock import patch, MagicMock, Mock
-import sys
-import os
-import json
+import copy
 
-# Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pytest
+from unittest.mock import patch, MagicMock
 
+from src.models.database import DatabaseManager
+from src.models.free_translator import FreeTranslator
 from src.models.telegram_bot import TelegramBot
 
 
-class TestTelegramBot(unittest.TestCase):
-    """Test cases for TelegramBot class"""
+# Keep the tests that share the module-scoped bot on one worker
+pytestmark = pytest.mark.xdist_group(name="bot")
+
+
+class _FakeResp:
+    """Minimal stand-in for requests.Response"""
+    __slots__ = ('status_code', '_json')
+    
+    def __init__(self, status_code, json_data=None):
+        self.status_code = status_code
+        self._json = json_data
+    
+    def json(self):
+        return self._json
+
+
+def _json_payload(mock_post):
+    """JSON body of the last request sent through the mock"""
+    return mock_post.call_args.kwargs['json']
+
+
+class _StubDB:
+    """Database stand-in that returns fixed language preferences"""
+    __slots__ = ('_prefs',)
     
-    def setUp(self):
-        """Set up test fixtures"""
-        # Mock environment variable
-        with patch.dict('os.environ', {'TELEGRAM_BOT_TOKEN': 'test_token_123'}):
-            self.bot = TelegramBot()
+    def __init__(self, prefs):
+        self._prefs = prefs
+    
+    def get_user_preferences(self, chat_id):
+        return self._prefs
+
+
+@pytest.fixture(scope="session")
+def _bot_template():
+    """Bot built once with a test token; tests get shallow copies of it"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('TELEGRAM_BOT_TOKEN', 'test_token_123')
+        return TelegramBot()
+
+
+def _copy_with_mock_collaborators(template):
+    """Shallow copy of the bot with its database and translator replaced by mocks"""
+    bot = copy.copy(template)
+    bot.db = MagicMock()
+    bot.translator = MagicMock()
+    return bot
+
+
+@pytest.fixture(scope="module")
+def bot(_bot_template):
+    """Bot shared by the tests that leave its state alone"""
+    return _copy_with_mock_collaborators(_bot_template)
+
+
+@pytest.fixture
+def bot_fresh(_bot_template):
+    """Per-test bot for tests that stub attributes on it"""
+    return _copy_with_mock_collaborators(_bot_template)
+
+
+@pytest.fixture(autouse=True)
+def mock_requests(monkeypatch):
+    """Stub out Telegram HTTP calls; tests that care configure the returned mock"""
+    mock = MagicMock()
+    monkeypatch.setattr('requests.post', mock)
+    monkeypatch.setattr('requests.get', mock)
+    return mock
+
+
+class TestTelegramBot:
+    """Test cases for TelegramBot class"""
     
-    def test_bot_initialization(self):
+    def test_bot_initialization(self, _bot_template):
         """Test that bot initializes correctly"""
-        self.assertEqual(self.bot.token, 'test_token_123')
-        self.assertEqual(self.bot.base_url, 'https://api.telegram.org/bottest_token_123')
-        self.assertIsNotNone(self.bot.translator)
-        self.assertIsNotNone(self.bot.db)
+        bot = _bot_template
+        assert bot.token == 'test_token_123'
+        assert bot.base_url == 'https://api.telegram.org/bottest_token_123'
+        assert isinstance(bot.translator, FreeTranslator)
+        assert isinstance(bot.db, DatabaseManager)
     
-    def test_bot_initialization_missing_token(self):
+    def test_bot_initialization_missing_token(self, monkeypatch):
         """Test that bot raises error when token is missing"""
-        with patch.dict('os.environ', {}, clear=True):
-            with self.assertRaises(ValueError):
-                TelegramBot()
+        monkeypatch.delenv('TELEGRAM_BOT_TOKEN', raising=False)
+        with pytest.raises(ValueError):
+            TelegramBot()
     
-    @patch('requests.post')
-    def test_send_message_success(self, mock_post):
+    def test_send_message_success(self, mock_requests, bot):
         """Test successful message sending"""
         # Mock successful response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+        mock_requests.return_value = _FakeResp(200)
         
         # Test sending message
-        result = self.bot.send_message(12345, "Hello world")
+        result = bot.send_message(12345, "Hello world")
         
         # Verify result
-        self.assertTrue(result)
-        mock_post.assert_called_once()
+        assert result
+        mock_requests.assert_called_once()
         
         # Verify call arguments
-        call_args = mock_post.call_args
-        self.assertEqual(call_args[1]['json']['chat_id'], 12345)
-        self.assertEqual(call_args[1]['json']['text'], "Hello world")
-        self.assertEqual(call_args[1]['json']['parse_mode'], 'Markdown')
+        assert _json_payload(mock_requests) == {'chat_id': 12345, 'text': "Hello world", 'parse_mode': 'Markdown'}
     
-    @patch('requests.post')
-    def test_send_message_failure(self, mock_post):
+    def test_send_message_failure(self, mock_requests, bot):
         """Test message sending failure"""
         # Mock failed response
-        mock_response = MagicMock()
-        mock_response.status_code = 400
-        mock_post.return_value = mock_response
+        mock_requests.return_value = _FakeResp(400)
         
         # Test sending message
-        result = self.bot.send_message(12345, "Hello world")
+        result = bot.send_message(12345, "Hello world")
         
         # Verify result
-        self.assertFalse(result)
+        assert not result
     
-    @patch('requests.post')
-    def test_send_message_exception(self, mock_post):
+    def test_send_message_exception(self, mock_requests, bot):
         """Test message sending with exception"""
         # Mock RequestException (which is caught by the method)
         from requests import RequestException
-        mock_post.side_effect = RequestException("Network error")
+        mock_requests.side_effect = RequestException("Network error")
         
         # Test sending message
-        result = self.bot.send_message(12345, "Hello world")
+        result = bot.send_message(12345, "Hello world")
         
         # Verify result
-        self.assertFalse(result)
+        assert not result
     
-    @patch('requests.post')
-    def test_delete_message_success(self, mock_post):
+    def test_delete_message_success(self, mock_requests, bot):
         """Test successful message deletion"""
         # Mock successful response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"ok": True}
-        mock_post.return_value = mock_response
+        mock_requests.return_value = _FakeResp(200, {"ok": True})
         
         # Test deleting message
-        result = self.bot.delete_message(12345, 67890)
+        result = bot.delete_message(12345, 67890)
         
         # Verify result
-        self.assertTrue(result)
-        mock_post.assert_called_once()
+        assert result
+        mock_requests.assert_called_once()
         
         # Verify call arguments
-        call_args = mock_post.call_args
-        self.assertEqual(call_args[1]['json']['chat_id'], 12345)
-        self.assertEqual(call_args[1]['json']['message_id'], 67890)
+        assert _json_payload(mock_requests) == {'chat_id': 12345, 'message_id': 67890}
     
-    @patch('requests.post')
-    def test_delete_message_failure(self, mock_post):
+    def test_delete_message_failure(self, mock_requests, bot):
         """Test message deletion failure"""
         # Mock failed response
-        mock_response = MagicMock()
-        mock_response.status_code = 400
-        mock_response.json.return_value = {"ok": False, "error_code": 400}
-        mock_post.return_value = mock_response
+        mock_requests.return_value = _FakeResp(400, {"ok": False, "error_code": 400})
         
         # Test deleting message
-        result = self.bot.delete_message(12345, 67890)
+        result = bot.delete_message(12345, 67890)
         
         # Verify result
-        self.assertFalse(result)
+        assert not result
     
-    @patch('requests.post')
-    def test_send_keyboard_success(self, mock_post):
+    def test_send_keyboard_success(self, mock_requests, bot):
         """Test successful keyboard sending"""
         # Mock successful response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+        mock_requests.return_value = _FakeResp(200)
         
         # Test keyboard
         keyboard = [["English", "Spanish"], ["French", "German"]]
-        result = self.bot.send_keyboard(12345, "Choose language:", keyboard)
+        result = bot.send_keyboard(12345, "Choose language:", keyboard)
         
         # Verify result
-        self.assertTrue(result)
-        mock_post.assert_called_once()
+        assert result
+        mock_requests.assert_called_once()
         
         # Verify call arguments
-        call_args = mock_post.call_args
-        self.assertEqual(call_args[1]['json']['chat_id'], 12345)
-        self.assertEqual(call_args[1]['json']['text'], "Choose language:")
-        self.assertIn('reply_markup', call_args[1]['json'])
-        self.assertIn('inline_keyboard', call_args[1]['json']['reply_markup'])
+        payload = _json_payload(mock_requests)
+        assert payload['chat_id'] == 12345
+        assert payload['text'] == "Choose language:"
+        assert 'inline_keyboard' in payload['reply_markup']
     
-    @patch('requests.post')
-    def test_answer_callback_query_success(self, mock_post):
+    def test_answer_callback_query_success(self, mock_requests, bot):
         """Test successful callback query answering"""
         # Mock successful response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_post.return_value = mock_response
+        mock_requests.return_value = _FakeResp(200)
         
         # Test answering callback
-        result = self.bot.answer_callback_query("callback_123", "Selected!")
+        result = bot.answer_callback_query("callback_123", "Selected!")
         
         # Verify result
-        self.assertTrue(result)
-        mock_post.assert_called_once()
+        assert result
+        mock_requests.assert_called_once()
         
         # Verify call arguments
-        call_args = mock_post.call_args
-        self.assertEqual(call_args[1]['json']['callback_query_id'], "callback_123")
-        self.assertEqual(call_args[1]['json']['text'], "Selected!")
+        assert _json_payload(mock_requests) == {'callback_query_id': "callback_123", 'text': "Selected!"}
     
-    def test_get_language_flag(self):
-        """Test language flag mapping"""
-        # Test known languages
-        self.assertEqual(self.bot._get_language_flag('en'), '🇺🇸')
-        self.assertEqual(self.bot._get_language_flag('es'), '🇪🇸')
-        self.assertEqual(self.bot._get_language_flag('fr'), '🇫🇷')
-        
-        # Test unknown language
-        self.assertEqual(self.bot._get_language_flag('unknown'), '🌍')
+    @pytest.mark.parametrize("code,flag", [
+        ('en', '🇺🇸'),
+        ('es', '🇪🇸'),
+        ('fr', '🇫🇷'),
+        ('unknown', '🌍'),
+    ])
+    def test_get_language_flag(self, bot, code, flag):
+        """Test language flag mapping, including the fallback for unknown languages"""
+        assert bot._get_language_flag(code) == flag
     
-    def test_create_language_keyboard(self):
+    def test_create_language_keyboard(self, bot):
         """Test language keyboard creation"""
         # Test without exclusion
-        keyboard = self.bot._create_language_keyboard()
-        self.assertIsInstance(keyboard, list)
-        self.assertGreater(len(keyboard), 0)
+        keyboard = bot._create_language_keyboard()
+        assert isinstance(keyboard, tuple)
+        assert len(keyboard) > 0
         
         # Verify structure
         for row in keyboard:
-            self.assertIsInstance(row, list)
-            self.assertLessEqual(len(row), 3)  # Max 3 per row
+            assert isinstance(row, tuple)
+            assert len(row) <= 3  # Max 3 per row
             for button in row:
-                self.assertIsInstance(button, tuple)
-                self.assertEqual(len(button), 2)  # (display_text, callback_data)
+                assert isinstance(button, tuple)
+                assert len(button) == 2  # (display_text, callback_data)
         
         # Test with exclusion
-        keyboard_excluded = self.bot._create_language_keyboard(exclude_lang='en')
+        keyboard_excluded = bot._create_language_keyboard(exclude_lang='en')
         # Verify 'en' is not in any button
         for row in keyboard_excluded:
             for button in row:
-                self.assertNotIn('en', button[1])  # callback_data should not contain 'en'
+                assert 'en' not in button[1]  # callback_data should not contain 'en'
     
-    def test_get_language_code_from_button(self):
+    def test_get_language_code_from_button(self, bot):
         """Test extracting language code from button text"""
         # Test valid button text
         button_text = "🇺🇸 English"
-        result = self.bot._get_language_code_from_button(button_text)
-        self.assertEqual(result, "en")
+        result = bot._get_language_code_from_button(button_text)
+        assert result == "en"
         
         # Test invalid button text
         invalid_texts = ["", "English", "🇺🇸", "🇺🇸 English Spanish"]
         for text in invalid_texts:
-            result = self.bot._get_language_code_from_button(text)
-            self.assertIsNone(result)
+            result = bot._get_language_code_from_button(text)
+            assert result is None
     
     @patch.object(TelegramBot, 'get_user_language_pair')
     @patch.object(TelegramBot, 'set_user_language_pair')
-    def test_set_user_language_pair_valid(self, mock_set, mock_get):
+    def test_set_user_language_pair_valid(self, mock_set, mock_get, bot):
         """Test setting valid language pair"""
         mock_set.return_value = True
         
-        result = self.bot.set_user_language_pair(12345, "en", "es")
+        result = bot.set_user_language_pair(12345, "en", "es")
         
-        self.assertTrue(result)
+        assert result
         mock_set.assert_called_once_with(12345, "en", "es")
     
-    def test_set_user_language_pair_invalid(self):
+    def test_set_user_language_pair_invalid(self, bot):
         """Test setting invalid language pair"""
         # Same language
-        result = self.bot.set_user_language_pair(12345, "en", "en")
-        self.assertFalse(result)
+        result = bot.set_user_language_pair(12345, "en", "en")
+        assert not result
         
         # Invalid language codes
-        result = self.bot.set_user_language_pair(12345, "invalid", "en")
-        self.assertFalse(result)
+        result = bot.set_user_language_pair(12345, "invalid", "en")
+        assert not result
         
-        result = self.bot.set_user_language_pair(12345, "en", "invalid")
-        self.assertFalse(result)
+        result = bot.set_user_language_pair(12345, "en", "invalid")
+        assert not result
     
-    def test_get_user_language_pair_with_preferences(self):
+    def test_get_user_language_pair_with_preferences(self, bot_fresh):
         """Test getting user language pair with existing preferences"""
-        # Mock the database method directly on the instance
-        self.bot.db.get_user_preferences = lambda chat_id: ("en", "es")
+        bot_fresh.db = _StubDB(("en", "es"))
         
-        result = self.bot.get_user_language_pair(12345)
+        result = bot_fresh.get_user_language_pair(12345)
         
-        self.assertEqual(result, ("en", "es"))
+        assert result == ("en", "es")
     
-    def test_get_user_language_pair_default(self):
+    def test_get_user_language_pair_default(self, bot_fresh):
         """Test getting user language pair with default fallback"""
-        # Mock the database method to return None
-        self.bot.db.get_user_preferences = lambda chat_id: None
+        bot_fresh.db = _StubDB(None)
         
-        result = self.bot.get_user_language_pair(12345)
+        result = bot_fresh.get_user_language_pair(12345)
         
-        self.assertEqual(result, ("en", "ru"))  # Default fallback
+        assert result == ("en", "ru")  # Default fallback
     
-    def test_process_message_with_message(self):
+    def test_process_message_with_message(self, bot):
         """Test processing message with regular message"""
         update = {
             "message": {
@@ -256,11 +287,11 @@ class TestTelegramBot(unittest.TestCase):
             }
         }
         
-        with patch.object(self.bot, '_handle_message') as mock_handle:
-            self.bot.process_message(update)
+        with patch.object(bot, '_handle_message') as mock_handle:
+            bot.process_message(update)
             mock_handle.assert_called_once_with(update["message"])
     
-    def test_process_message_with_callback_query(self):
+    def test_process_message_with_callback_query(self, bot):
         """Test processing message with callback query"""
         update = {
             "callback_query": {
@@ -270,11 +301,11 @@ class TestTelegramBot(unittest.TestCase):
             }
         }
         
-        with patch.object(self.bot, '_handle_callback_query') as mock_handle:
-            self.bot.process_message(update)
+        with patch.object(bot, '_handle_callback_query') as mock_handle:
+            bot.process_message(update)
             mock_handle.assert_called_once_with(update["callback_query"])
     
-    def test_process_message_with_edited_message(self):
+    def test_process_message_with_edited_message(self, bot):
         """Test processing message with edited message"""
         update = {
             "edited_message": {
@@ -284,11 +315,11 @@ class TestTelegramBot(unittest.TestCase):
             }
         }
         
-        with patch.object(self.bot, '_handle_edited_message') as mock_handle:
-            self.bot.process_message(update)
+        with patch.object(bot, '_handle_edited_message') as mock_handle:
+            bot.process_message(update)
             mock_handle.assert_called_once_with(update["edited_message"])
     
-    def test_process_message_invalid_update(self):
+    def test_process_message_invalid_update(self, bot):
         """Test processing message with invalid update"""
         invalid_updates = [
             {},
@@ -298,70 +329,42 @@ class TestTelegramBot(unittest.TestCase):
         
         for update in invalid_updates:
             # Should not raise exception
-            try:
-                self.bot.process_message(update)
-            except Exception as e:
-                self.fail(f"process_message raised {e} unexpectedly for update: {update}")
+            bot.process_message(update)
     
-    def test_extract_language_code(self):
+    def test_extract_language_code(self, bot):
         """Test extracting language code from callback data"""
         # Test direct language code
-        result = self.bot._extract_language_code("en")
-        self.assertEqual(result, "en")
+        result = bot._extract_language_code("en")
+        assert result == "en"
         
         # Test button text format
-        with patch.object(self.bot, '_get_language_code_from_button') as mock_extract:
+        with patch.object(bot, '_get_language_code_from_button') as mock_extract:
             mock_extract.return_value = "es"
-            result = self.bot._extract_language_code("🇪🇸 Spanish")
-            self.assertEqual(result, "es")
+            result = bot._extract_language_code("🇪🇸 Spanish")
+            assert result == "es"
             mock_extract.assert_called_once_with("🇪🇸 Spanish")
     
-    def test_get_language_from_flag(self):
+    @pytest.mark.parametrize("flag,code", [
+        ('🇺🇸', 'en'),
+        ('🇪🇸', 'es'),
+        ('🇫🇷', 'fr'),
+        ('🏳️', None),
+    ])
+    def test_get_language_from_flag(self, bot, flag, code):
         """Test getting language code from flag emoji"""
-        # Test known flags
-        self.assertEqual(self.bot._get_language_from_flag('🇺🇸'), 'en')
-        self.assertEqual(self.bot._get_language_from_flag('🇪🇸'), 'es')
-        self.assertEqual(self.bot._get_language_from_flag('🇫🇷'), 'fr')
-        
-        # Test unknown flag
-        self.assertIsNone(self.bot._get_language_from_flag('🏳️'))
+        assert bot._get_language_from_flag(flag) == code
     
+    @pytest.mark.parametrize("command,expected_texts", [
+        ("/start", ("Welcome to Language Buddy Bot", "/setpair")),
+        ("/help", ("Language Buddy Bot Help", "/setpair")),
+        ("/unknown", ("Unknown command", "/help")),
+    ])
     @patch.object(TelegramBot, 'send_message')
-    def test_handle_command_start(self, mock_send):
-        """Test handling /start command"""
-        self.bot._handle_command(12345, 67890, "/start")
+    def test_handle_command(self, mock_send, bot, command, expected_texts):
+        """Test that each command replies with its own message"""
+        bot._handle_command(12345, 67890, command)
         mock_send.assert_called_once()
         
-        # Verify message contains welcome text
-        call_args = mock_send.call_args
-        message_text = call_args[0][1]  # First positional argument is text
-        self.assertIn("Welcome to Language Buddy Bot", message_text)
-        self.assertIn("/setpair", message_text)
-    
-    @patch.object(TelegramBot, 'send_message')
-    def test_handle_command_help(self, mock_send):
-        """Test handling /help command"""
-        self.bot._handle_command(12345, 67890, "/help")
-        mock_send.assert_called_once()
-        
-        # Verify message contains help text
-        call_args = mock_send.call_args
-        message_text = call_args[0][1]  # First positional argument is text
-        self.assertIn("Language Buddy Bot Help", message_text)
-        self.assertIn("/setpair", message_text)
-    
-    @patch.object(TelegramBot, 'send_message')
-    def test_handle_command_unknown(self, mock_send):
-        """Test handling unknown command"""
-        self.bot._handle_command(12345, 67890, "/unknown")
-        mock_send.assert_called_once()
-        
-        # Verify error message
-        call_args = mock_send.call_args
-        message_text = call_args[0][1]  # First positional argument is text
-        self.assertIn("Unknown command", message_text)
-        self.assertIn("/help", message_text)
-
-
-if __name__ == '__main__':
-    unittest.main()
+        message_text = mock_send.call_args[0][1]  # Second positional argument is text
+        for expected in expected_texts:
+            assert expected in message_text
@@ -2,6 +2,16 @@ import pytest
 from src.models.transcription_result import TranscriptionResult, TranscriptionQualityAnalyzer
 
 
+# Fixed inputs for the text quality score tests
+_QUALITY_INPUTS = ("", "   ", "Hi", "Hello world!", "Helllllo world", "Hello @#$% world")
+
+
+@pytest.fixture(scope="module")
+def scores():
+    """Quality score of every fixed input, computed once per module"""
+    return {text: TranscriptionQualityAnalyzer.calculate_text_quality_score(text) for text in _QUALITY_INPUTS}
+
+
 class TestTranscriptionResult:
     """Test TranscriptionResult class"""
     
@@ -19,22 +29,16 @@ class TestTranscriptionResult:
         assert result.language_code is None
         assert result.raw_response is None
     
-    def test_transcription_result_validation(self):
+    @pytest.mark.parametrize("kwargs,match", [
+        (dict(text="", service="whisper", confidence=0.9), "Transcription text cannot be empty"),
+        (dict(text="Hello", service="whisper", confidence=1.5), "Confidence must be between 0.0 and 1.0"),
+        (dict(text="Hello", service="whisper", confidence=-0.1), "Confidence must be between 0.0 and 1.0"),
+        (dict(text="Hello", service="", confidence=0.9), "Service name cannot be empty"),
+    ], ids=["empty_text", "confidence_above_one", "negative_confidence", "empty_service"])
+    def test_transcription_result_validation(self, kwargs, match):
         """Test TranscriptionResult validation"""
-        # Test empty text
-        with pytest.raises(ValueError, match="Transcription text cannot be empty"):
-            TranscriptionResult(text="", service="whisper", confidence=0.9)
-        
-        # Test invalid confidence
-        with pytest.raises(ValueError, match="Confidence must be between 0.0 and 1.0"):
-            TranscriptionResult(text="Hello", service="whisper", confidence=1.5)
-        
-        with pytest.raises(ValueError, match="Confidence must be between 0.0 and 1.0"):
-            TranscriptionResult(text="Hello", service="whisper", confidence=-0.1)
-        
-        # Test empty service
-        with pytest.raises(ValueError, match="Service name cannot be empty"):
-            TranscriptionResult(text="Hello", service="", confidence=0.9)
+        with pytest.raises(ValueError, match=match):
+            TranscriptionResult(**kwargs)
     
     def test_confidence_levels(self):
         """Test confidence level methods"""
@@ -70,33 +74,26 @@ class TestTranscriptionResult:
 class TestTranscriptionQualityAnalyzer:
     """Test TranscriptionQualityAnalyzer class"""
     
-    def test_calculate_text_quality_score_empty(self):
+    def test_calculate_text_quality_score_empty(self, scores):
         """Test quality score calculation for empty text"""
-        score = TranscriptionQualityAnalyzer.calculate_text_quality_score("")
-        assert score == 0.0
-        
-        score = TranscriptionQualityAnalyzer.calculate_text_quality_score("   ")
-        assert score == 0.0
+        assert scores[""] == 0.0
+        assert scores["   "] == 0.0
     
-    def test_calculate_text_quality_score_short(self):
+    def test_calculate_text_quality_score_short(self, scores):
         """Test quality score calculation for short text"""
-        score = TranscriptionQualityAnalyzer.calculate_text_quality_score("Hi")
-        assert score < 1.0  # Should be penalized for being too short
+        assert scores["Hi"] < 1.0  # Should be penalized for being too short
     
-    def test_calculate_text_quality_score_good(self):
+    def test_calculate_text_quality_score_good(self, scores):
         """Test quality score calculation for good text"""
-        score = TranscriptionQualityAnalyzer.calculate_text_quality_score("Hello world!")
-        assert score > 0.8  # Should have good score
+        assert scores["Hello world!"] > 0.8  # Should have good score
     
-    def test_calculate_text_quality_score_repeated_chars(self):
+    def test_calculate_text_quality_score_repeated_chars(self, scores):
         """Test quality score calculation for text with repeated characters"""
-        score = TranscriptionQualityAnalyzer.calculate_text_quality_score("Helllllo world")
-        assert 0.0 <= score <= 1.0  # Should be a valid score
+        assert 0.0 <= scores["Helllllo world"] <= 1.0  # Should be a valid score
     
-    def test_calculate_text_quality_score_special_chars(self):
+    def test_calculate_text_quality_score_special_chars(self, scores):
         """Test quality score calculation for text with special characters"""
-        score = TranscriptionQualityAnalyzer.calculate_text_quality_score("Hello @#$% world")
-        assert 0.0 <= score <= 1.0  # Should be a valid score
+        assert 0.0 <= scores["Hello @#$% world"] <= 1.0  # Should be a valid score
     
     def test_compare_transcriptions_single(self):
         """Test comparing single transcription"""
@@ -1,205 +1,356 @@
+import copy
+import threading
+from collections import OrderedDict
+from types import MappingProxyType, SimpleNamespace
+
 import pytest
-import os
-from unittest.mock import Mock, patch, MagicMock
+import requests
+import requests_mock
+from requests.adapters import HTTPAdapter
+from src.models.transcription_result import TranscriptionResult
+from src.models import voice_transcriber as voice_transcriber_module
 from src.models.voice_transcriber import VoiceTranscriber
 
 
+_TELEGRAM_API = "https://api.telegram.org"
+_VOICE_BYTES = b'fake_audio_data'
+_FILE_ID = 'test_file_id'
+_FILE_PATH = 'voice/file_123.ogg'
+# Read-only so no test can change the getFile response the others rely on
+_FILE_INFO = MappingProxyType({'ok': True, 'result': MappingProxyType({'file_path': _FILE_PATH})})
+_HELLO = "Hello world"
+# Bot tokens select which canned Telegram responses the tests get
+_TOKEN = 'test_token'
+_MISSING_FILE_TOKEN = 'missing_file_token'
+
+# Credentials that would otherwise switch real services on during the tests
+_CREDENTIAL_ENV_VARS = (
+    'ASSEMBLYAI_API_KEY',
+    'GOOGLE_APPLICATION_CREDENTIALS',
+    'GOOGLE_APPLICATION_CREDENTIALS_JSON',
+    'TELEGRAM_BOT_TOKEN',
+    'OPENAI_API_KEY',
+)
+
+# Service account JSON accepted by VoiceTranscriber (never used against Google)
+_GOOGLE_CREDENTIALS_JSON = '{"type": "service_account", "project_id": "test", "private_key_id": "test", "private_key": "test", "client_email": "test@test.com", "client_id": "test", "auth_uri": "https://accounts.google.com/o/oauth2/auth", "token_uri": "https://oauth2.googleapis.com/token", "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs", "client_x509_cert_url": "test"}'
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    """Start every test without service credentials; monkeypatch restores them afterwards"""
+    for key in _CREDENTIAL_ENV_VARS:
+        monkeypatch.delenv(key, raising=False)
+
+
+@pytest.fixture(autouse=True)
+def _fake_tempfile(mocker):
+    """Keep temp audio files off disk; every NamedTemporaryFile reports /tmp/test.ogg"""
+    fake = mocker.patch('tempfile.NamedTemporaryFile')
+    fake.return_value.__enter__.return_value.name = '/tmp/test.ogg'
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    """Make time.sleep a no-op; the returned list holds the total seconds requested"""
+    total = [0.0]
+    
+    def _record(seconds):
+        total[0] += seconds
+    
+    monkeypatch.setattr('time.sleep', _record)
+    return total
+
+
+def _build_transcriber(**env):
+    """Construct a VoiceTranscriber with only the given credentials in the environment"""
+    with pytest.MonkeyPatch.context() as mp:
+        for key in _CREDENTIAL_ENV_VARS:
+            mp.delenv(key, raising=False)
+        for key, value in env.items():
+            mp.setenv(key, value)
+        return VoiceTranscriber()
+
+
+def _copy_transcriber(template, adapter):
+    """Copy of a shared transcriber with its own rate limits, transcription cache and HTTP session"""
+    transcriber = copy.copy(template)
+    transcriber.rate_limits = copy.deepcopy(template.rate_limits)
+    transcriber._transcription_cache = OrderedDict()
+    transcriber.session = requests.Session()
+    transcriber.session.mount('https://', adapter)
+    return transcriber
+
+
+@pytest.fixture(scope="module")
+def transcriber_no_keys():
+    """Transcriber built once without credentials, for tests that only read it"""
+    return _build_transcriber()
+
+
+@pytest.fixture(scope="module")
+def transcriber_with_keys():
+    """Transcriber built once with AssemblyAI and Google credentials"""
+    return _build_transcriber(
+        ASSEMBLYAI_API_KEY='test_key',
+        GOOGLE_APPLICATION_CREDENTIALS_JSON=_GOOGLE_CREDENTIALS_JSON,
+    )
+
+
+@pytest.fixture(scope="module")
+def telegram_adapter():
+    """requests-mock transport with the Telegram endpoints registered once per module"""
+    adapter = requests_mock.Adapter()
+    # json= needs plain dicts to serialise
+    adapter.register_uri('POST', f"{_TELEGRAM_API}/bot{_TOKEN}/getFile", json={**_FILE_INFO, 'result': dict(_FILE_INFO['result'])})
+    adapter.register_uri('GET', f"{_TELEGRAM_API}/file/bot{_TOKEN}/{_FILE_PATH}", content=_VOICE_BYTES)
+    adapter.register_uri('POST', f"{_TELEGRAM_API}/bot{_MISSING_FILE_TOKEN}/getFile", status_code=404, text='File not found')
+    return adapter
+
+
+@pytest.fixture
+def http_adapter(telegram_adapter):
+    """The shared Telegram transport with its request history cleared for this test"""
+    telegram_adapter.reset()
+    return telegram_adapter
+
+
+@pytest.fixture
+def transcriber(transcriber_no_keys, http_adapter):
+    """Per-test credential-free transcriber for tests that call its methods"""
+    return _copy_transcriber(transcriber_no_keys, http_adapter)
+
+
+@pytest.fixture
+def keyed_transcriber(transcriber_with_keys, http_adapter):
+    """Per-test transcriber with credentials for tests that call the services"""
+    return _copy_transcriber(transcriber_with_keys, http_adapter)
+
+
+@pytest.fixture
+def mocked_download(monkeypatch):
+    """Point the transcriber at the bot token whose voice file downloads successfully"""
+    monkeypatch.setenv('TELEGRAM_BOT_TOKEN', _TOKEN)
+    return _VOICE_BYTES
+
+
+def _confident_result(text, service):
+    """High-confidence result for the given text, or None when the service should fail"""
+    if text is None:
+        return None
+    return TranscriptionResult(text=text, service=service, confidence=0.9)
+
+
+class _FakeClock:
+    """Stand-in for the time module whose sleep() advances time() instantly"""
+    
+    def __init__(self, now=0.0):
+        self.now = now
+        self.sleeps = []
+    
+    def time(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _set_outcome(api_call, outcome):
+    """Make a mocked API call return the outcome, or raise it if it is an exception"""
+    if isinstance(outcome, Exception):
+        api_call.side_effect = outcome
+    else:
+        api_call.return_value = outcome
+
+
+def _assert_transcription(result, expected_text, service):
+    """Check a service result against the text it should carry, or None on failure"""
+    if expected_text is None:
+        assert result is None
+        return
+    assert result is not None
+    assert result.text == expected_text
+    assert result.service == service
+    assert 0.0 <= result.confidence <= 1.0
+
+
+@pytest.mark.no_network
 class TestVoiceTranscriber:
     """Test cases for VoiceTranscriber class"""
     
-    def setup_method(self):
-        """Set up test environment"""
-        # Clear environment variables for testing
-        self.original_env = {}
-        for key in ['ASSEMBLYAI_API_KEY', 'GOOGLE_APPLICATION_CREDENTIALS', 'GOOGLE_APPLICATION_CREDENTIALS_JSON', 'TELEGRAM_BOT_TOKEN']:
-            if key in os.environ:
-                self.original_env[key] = os.environ[key]
-                del os.environ[key]
-    
-    def teardown_method(self):
-        """Restore environment variables"""
-        for key, value in self.original_env.items():
-            os.environ[key] = value
-    
-    def test_init_no_api_keys(self):
+    def test_init_no_api_keys(self, transcriber_no_keys):
         """Test initialization without API keys"""
-        transcriber = VoiceTranscriber()
-        
-        assert transcriber.services_available['assemblyai'] == False
-        assert transcriber.services_available['google_speech'] == False
+        assert transcriber_no_keys.services_available['assemblyai'] == False
+        assert transcriber_no_keys.services_available['google_speech'] == False
     
-    def test_init_with_api_keys(self):
+    def test_init_with_api_keys(self, transcriber_with_keys):
         """Test initialization with API keys"""
-        os.environ['ASSEMBLYAI_API_KEY'] = 'test_key'
-        os.environ['GOOGLE_APPLICATION_CREDENTIALS_JSON'] = '{"type": "service_account", "project_id": "test", "private_key_id": "test", "private_key": "test", "client_email": "test@test.com", "client_id": "test", "auth_uri": "https://accounts.google.com/o/oauth2/auth", "token_uri": "https://oauth2.googleapis.com/token", "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs", "client_x509_cert_url": "test"}'
-        
-        transcriber = VoiceTranscriber()
-        
-        assert transcriber.services_available['assemblyai'] == True
-        assert transcriber.services_available['google_speech'] == True
+        assert transcriber_with_keys.services_available['assemblyai'] == True
+        assert transcriber_with_keys.services_available['google_speech'] == True
     
-    @patch('requests.post')
-    @patch('requests.get')
-    def test_download_voice_file_success(self, mock_get, mock_post):
+    def test_download_voice_file_success(self, mocked_download, http_adapter, transcriber):
         """Test successful voice file download"""
-        # Mock file info response
-        mock_post.return_value.status_code = 200
-        mock_post.return_value.json.return_value = {
-            'ok': True,
-            'result': {'file_path': 'voice/file_123.ogg'}
-        }
-        
-        # Mock file download response
-        mock_get.return_value.status_code = 200
-        mock_get.return_value.content = b'fake_audio_data'
-        
-        # Set required environment variable
-        os.environ['TELEGRAM_BOT_TOKEN'] = 'test_token'
+        result = transcriber._download_voice_file(_FILE_ID)
         
-        transcriber = VoiceTranscriber()
-        result = transcriber._download_voice_file('test_file_id')
-        
-        assert result == b'fake_audio_data'
+        assert result == mocked_download
+        assert http_adapter.call_count == 2
     
-    @patch('requests.post')
-    def test_download_voice_file_failure(self, mock_post):
+    def test_download_voice_file_failure(self, http_adapter, monkeypatch, transcriber):
         """Test voice file download failure"""
-        mock_post.return_value.status_code = 404
-        mock_post.return_value.text = 'File not found'
+        monkeypatch.setenv('TELEGRAM_BOT_TOKEN', _MISSING_FILE_TOKEN)
         
-        transcriber = VoiceTranscriber()
-        result = transcriber._download_voice_file('test_file_id')
+        result = transcriber._download_voice_file(_FILE_ID)
         
         assert result is None
+        assert http_adapter.call_count == 1
     
-    @patch('src.models.voice_transcriber.ASSEMBLYAI_AVAILABLE', True)
-    @patch('src.models.voice_transcriber.aai')
-    def test_transcribe_with_assemblyai_success(self, mock_aai):
-        """Test successful AssemblyAI transcription"""
-        # Mock AssemblyAI response
-        mock_transcript = Mock()
-        mock_transcript.text = "Hello world"
-        mock_transcript.words = []  # Empty words list for confidence calculation
-        mock_aai.Transcriber.return_value.transcribe.return_value = mock_transcript
-        
-        os.environ['ASSEMBLYAI_API_KEY'] = 'test_key'
-        transcriber = VoiceTranscriber()
-        
-        with patch('tempfile.NamedTemporaryFile') as mock_temp:
-            mock_temp.return_value.__enter__.return_value.name = '/tmp/test.ogg'
-            result = transcriber._transcribe_with_assemblyai('/tmp/test.ogg')
-        
-        assert result is not None
-        assert result.text == "Hello world"
-        assert result.service == "assemblyai"
-        assert 0.0 <= result.confidence <= 1.0
-    
-    @patch('src.models.voice_transcriber.ASSEMBLYAI_AVAILABLE', True)
-    @patch('src.models.voice_transcriber.aai')
-    def test_transcribe_with_assemblyai_failure(self, mock_aai):
-        """Test AssemblyAI transcription failure"""
-        mock_aai.Transcriber.return_value.transcribe.side_effect = ValueError("API Error")
-        
-        os.environ['ASSEMBLYAI_API_KEY'] = 'test_key'
-        transcriber = VoiceTranscriber()
-        
-        with patch('tempfile.NamedTemporaryFile') as mock_temp:
-            mock_temp.return_value.__enter__.return_value.name = '/tmp/test.ogg'
-            result = transcriber._transcribe_with_assemblyai('/tmp/test.ogg')
-        
-        assert result is None
+    @pytest.mark.parametrize("outcome,expected_text", [
+        (SimpleNamespace(text=_HELLO, words=[]), _HELLO),  # No words, so confidence comes from the text
+        (ValueError("API Error"), None),
+    ], ids=["success", "failure"])
+    def test_transcribe_with_assemblyai(self, mocker, keyed_transcriber, outcome, expected_text):
+        """Test AssemblyAI transcription success and API failure"""
+        mocker.patch('src.models.voice_transcriber.ASSEMBLYAI_AVAILABLE', True)
+        mock_aai = mocker.patch('src.models.voice_transcriber.aai', new_callable=mocker.Mock)
+        _set_outcome(mock_aai.Transcriber.return_value.transcribe, outcome)
+        
+        result = keyed_transcriber._transcribe_with_assemblyai('/tmp/test.ogg')
+        
+        _assert_transcription(result, expected_text, "assemblyai")
     
-    @patch('src.models.voice_transcriber.GOOGLE_SPEECH_AVAILABLE', True)
-    @patch('src.models.voice_transcriber.speech')
-    @patch('google.oauth2.service_account.Credentials.from_service_account_info')
-    def test_transcribe_with_google_speech_success(self, mock_credentials, mock_speech):
-        """Test successful Google Speech-to-Text transcription"""
-        # Mock credentials
-        mock_credentials.return_value = Mock()
-        
-        # Mock Google Speech response
-        mock_alternative = Mock()
-        mock_alternative.transcript = "Hello world"
-        mock_alternative.confidence = 0.9  # Add confidence score
-        
-        mock_result = Mock()
-        mock_result.alternatives = [mock_alternative]
-        mock_response = Mock()
-        mock_response.results = [mock_result]
-        mock_speech.SpeechClient.return_value.recognize.return_value = mock_response
-        
-        os.environ['GOOGLE_APPLICATION_CREDENTIALS_JSON'] = '{"type": "service_account", "project_id": "test"}'
-        transcriber = VoiceTranscriber()
-        
-        with patch('builtins.open', mock_open(read_data=b'fake_audio')):
-            result = transcriber._transcribe_with_google_speech('/tmp/test.ogg')
-        
-        assert result is not None
-        assert result.text == "Hello world"
-        assert result.service == "google_speech"
-        assert 0.0 <= result.confidence <= 1.0
+    @pytest.mark.parametrize("outcome,expected_text", [
+        (SimpleNamespace(results=[SimpleNamespace(alternatives=[SimpleNamespace(transcript=_HELLO, confidence=0.9)])]), _HELLO),
+        (ValueError("API Error"), None),
+    ], ids=["success", "failure"])
+    def test_transcribe_with_google_speech(self, mocker, keyed_transcriber, outcome, expected_text):
+        """Test Google Speech-to-Text transcription success and API failure"""
+        mocker.patch('src.models.voice_transcriber.GOOGLE_SPEECH_AVAILABLE', True)
+        mock_speech = mocker.patch('src.models.voice_transcriber.speech', new_callable=mocker.Mock)
+        mocker.patch('google.oauth2.service_account.Credentials.from_service_account_info')
+        mocker.patch('builtins.open', mocker.mock_open(read_data=b'fake_audio'))
+        _set_outcome(mock_speech.SpeechClient.return_value.recognize, outcome)
+        
+        result = keyed_transcriber._transcribe_with_google_speech('/tmp/test.ogg')
+        
+        _assert_transcription(result, expected_text, "google_speech")
+    
+    @pytest.mark.parametrize("whisper,assemblyai,google,expected", [
+        ("Hello from Whisper", None, None, "Hello from Whisper"),
+        (None, "Hello from AssemblyAI", None, "Hello from AssemblyAI"),
+        (None, None, "Hello from Google", "Hello from Google"),
+        (None, None, None, None),
+    ], ids=["whisper", "assemblyai_fallback", "google_fallback", "all_fail"])
+    def test_transcribe_voice_message(self, mocker, mocked_download, transcriber, whisper, assemblyai, google, expected):
+        """Test that each service is tried in turn until one returns a confident result"""
+        transcriber.services_available = {'whisper': True, 'assemblyai': True, 'google_speech': True}
+        transcriber.whisper_transcriber = mocker.Mock(transcribe_audio=mocker.Mock(return_value=_confident_result(whisper, 'whisper')))
+        transcriber._transcribe_with_assemblyai = mocker.Mock(return_value=_confident_result(assemblyai, 'assemblyai'))
+        transcriber._transcribe_with_google_speech = mocker.Mock(return_value=_confident_result(google, 'google_speech'))
+        
+        result = transcriber.transcribe_voice_message(_FILE_ID)
+        
+        assert result == expected
     
-    @patch('src.models.voice_transcriber.GOOGLE_SPEECH_AVAILABLE', True)
-    @patch('src.models.voice_transcriber.speech')
-    @patch('google.oauth2.service_account.Credentials.from_service_account_info')
-    def test_transcribe_with_google_speech_failure(self, mock_credentials, mock_speech):
-        """Test Google Speech-to-Text transcription failure"""
-        # Mock credentials
-        mock_credentials.return_value = Mock()
+    def test_transcribe_voice_message_parallel(self, mocker, mocked_download, transcriber):
+        """Test that parallel mode runs the services concurrently but still prefers them in fallback order"""
+        transcriber.parallel_services = True
+        transcriber.services_available = {'whisper': True, 'assemblyai': True, 'google_speech': False}
+        # Each service blocks until the other has started, so a sequential run would break the barrier
+        barrier = threading.Barrier(2, timeout=5)
         
-        mock_speech.SpeechClient.return_value.recognize.side_effect = ValueError("API Error")
+        def _after_barrier(text, service):
+            def transcribe(audio_path):
+                barrier.wait()
+                return _confident_result(text, service)
+            return transcribe
         
-        os.environ['GOOGLE_APPLICATION_CREDENTIALS_JSON'] = '{"type": "service_account", "project_id": "test"}'
-        transcriber = VoiceTranscriber()
+        transcriber.whisper_transcriber = mocker.Mock(transcribe_audio=_after_barrier("Hello from Whisper", 'whisper'))
+        transcriber._transcribe_with_assemblyai = _after_barrier("Hello from AssemblyAI", 'assemblyai')
         
-        with patch('builtins.open', mock_open(read_data=b'fake_audio')):
-            result = transcriber._transcribe_with_google_speech('/tmp/test.ogg')
+        result = transcriber.transcribe_voice_message(_FILE_ID)
         
-        assert result is None
+        assert result == "Hello from Whisper"
     
-    @patch('src.models.voice_transcriber.VoiceTranscriber._download_voice_file')
-    @patch('src.models.voice_transcriber.VoiceTranscriber._transcribe_with_assemblyai')
-    def test_transcribe_voice_message_success(self, mock_transcribe, mock_download):
-        """Test successful voice message transcription"""
-        from src.models.transcription_result import TranscriptionResult
-        
-        mock_download.return_value = b'fake_audio_data'
-        mock_transcribe.return_value = TranscriptionResult(
-            text="Hello world",
-            service="assemblyai",
-            confidence=0.8
-        )
-        
-        os.environ['ASSEMBLYAI_API_KEY'] = 'test_key'
-        transcriber = VoiceTranscriber()
+    def test_parallel_services_remove_audio_after_last_finishes(self, mocker, mocked_download, transcriber):
+        """Test that a slower service keeps the audio file after a confident result, and the last one removes it"""
+        transcriber.parallel_services = True
+        transcriber.services_available = {'whisper': True, 'assemblyai': True, 'google_speech': False}
+        release = threading.Event()
+        removed = threading.Event()
+        unlink = mocker.patch('os.unlink', side_effect=lambda path: removed.set())
+        
+        def _slow_assemblyai(audio_path):
+            release.wait(5)
+            return None
+        
+        transcriber.whisper_transcriber = mocker.Mock(transcribe_audio=mocker.Mock(return_value=_confident_result(_HELLO, 'whisper')))
+        transcriber._transcribe_with_assemblyai = _slow_assemblyai
+        
+        result = transcriber.transcribe_voice_message(_FILE_ID)
+        executor = transcriber._executor
+        
+        assert result == _HELLO
+        assert not removed.is_set()  # AssemblyAI is still using the file
+        release.set()
+        assert removed.wait(5)
+        unlink.assert_called_once_with('/tmp/test.ogg')
+        
+        # The next message reuses the same thread pool
+        transcriber._transcription_cache.clear()
+        transcriber.transcribe_voice_message(_FILE_ID)
+        assert transcriber._executor is executor
+    
+    def test_transcribe_voice_message_cache_hit(self, mocker, mocked_download, http_adapter, transcriber):
+        """Test that the same audio is transcribed once and served from the cache afterwards"""
+        transcriber.services_available = {'whisper': False, 'assemblyai': True, 'google_speech': False}
+        transcriber._transcribe_with_assemblyai = mocker.Mock(return_value=_confident_result(_HELLO, 'assemblyai'))
         
-        with patch('tempfile.NamedTemporaryFile') as mock_temp:
-            mock_temp.return_value.__enter__.return_value.name = '/tmp/test.ogg'
-            result = transcriber.transcribe_voice_message('test_file_id')
+        first = transcriber.transcribe_voice_message(_FILE_ID)
+        second = transcriber.transcribe_voice_message('forwarded_file_id')
         
-        assert result == "Hello world"
+        assert first == second == _HELLO
+        transcriber._transcribe_with_assemblyai.assert_called_once()
+        assert http_adapter.call_count == 4  # Each message is still downloaded
     
-    @patch('src.models.voice_transcriber.VoiceTranscriber._download_voice_file')
-    @patch('src.models.voice_transcriber.VoiceTranscriber._transcribe_with_assemblyai')
-    @patch('src.models.voice_transcriber.VoiceTranscriber._transcribe_with_google_speech')
-    def test_transcribe_voice_message_all_fail(self, mock_google, mock_assemblyai, mock_download):
-        """Test voice message transcription when all services fail"""
-        mock_download.return_value = b'fake_audio_data'
-        mock_assemblyai.return_value = None
-        mock_google.return_value = None
-        
-        transcriber = VoiceTranscriber()
+    def test_transcribe_voice_message_low_confidence_not_cached(self, mocker, mocked_download, transcriber):
+        """Test that a fallback below the threshold is not cached, so the same audio is transcribed again"""
+        transcriber.services_available = {'whisper': False, 'assemblyai': True, 'google_speech': False}
+        weak = TranscriptionResult(text=_HELLO, service='assemblyai', confidence=0.3)
+        transcriber._transcribe_with_assemblyai = mocker.Mock(return_value=weak)
+        
+        first = transcriber.transcribe_voice_message(_FILE_ID)
+        second = transcriber.transcribe_voice_message('forwarded_file_id')
+        
+        assert first == second == _HELLO
+        assert transcriber._transcribe_with_assemblyai.call_count == 2
+        assert not transcriber._transcription_cache
+    
+    def test_transcription_cache_evicts_least_recently_used(self, transcriber, monkeypatch):
+        """Test that the cache keeps only the most recently used transcriptions"""
+        monkeypatch.setattr(transcriber, 'TRANSCRIPTION_CACHE_SIZE', 2)
+        for name in ('a', 'b'):
+            transcriber._cache_transcription((name, 0.7), _confident_result(name, 'whisper'))
         
-        with patch('tempfile.NamedTemporaryFile') as mock_temp:
-            mock_temp.return_value.__enter__.return_value.name = '/tmp/test.ogg'
-            result = transcriber.transcribe_voice_message('test_file_id')
+        transcriber._get_cached_transcription(('a', 0.7))  # 'a' is now more recent than 'b'
+        transcriber._cache_transcription(('c', 0.7), _confident_result('c', 'whisper'))
         
-        assert result is None
+        assert list(transcriber._transcription_cache) == [('a', 0.7), ('c', 0.7)]
+    
+    def test_default_session_pools_connections(self, transcriber_no_keys):
+        """Test that the default HTTP session keeps connections alive and is shared with Whisper"""
+        adapter = transcriber_no_keys.session.get_adapter('https://api.telegram.org')
+        
+        assert isinstance(adapter, HTTPAdapter)
+        assert adapter._pool_maxsize == 10
+        assert adapter.max_retries.total == 2
+        assert not adapter.max_retries.respect_retry_after_header
+        assert transcriber_no_keys.whisper_transcriber.session is transcriber_no_keys.session
     
-    def test_get_service_status(self):
+    def test_get_service_status(self, transcriber_no_keys):
         """Test service status retrieval"""
-        transcriber = VoiceTranscriber()
-        status = transcriber.get_service_status()
+        status = transcriber_no_keys.get_service_status()
         
         assert 'services_available' in status
         assert 'rate_limits' in status
@@ -207,28 +358,28 @@ class TestVoiceTranscriber:
         assert 'assemblyai' in status['services_available']
         assert 'google_speech' in status['services_available']
     
-    @patch('time.sleep')
-    @patch('time.time')
-    def test_respect_rate_limit(self, mock_time, mock_sleep):
+    def test_respect_rate_limit_does_not_block(self, transcriber, no_sleep):
+        """Test that a back-to-back call on the real clock asks to wait without actually sleeping"""
+        transcriber._respect_rate_limit('google_speech')
+        transcriber._respect_rate_limit('google_speech')
+        
+        assert 0 < no_sleep[0] <= 1.0
+    
+    def test_respect_rate_limit(self, transcriber, monkeypatch):
         """Test rate limiting functionality"""
-        transcriber = VoiceTranscriber()
+        clock = _FakeClock()
+        monkeypatch.setattr(voice_transcriber_module, 'time', clock)
         
-        # Test 1: First call should sleep because time difference is 0 < min_interval (1)
-        mock_time.side_effect = [0, 0.5]
+        # First call at t=0 is within min_interval (1s) of last_request=0, so it waits the full interval
         transcriber._respect_rate_limit('assemblyai')
-        mock_sleep.assert_called_once_with(1.0)  # Should sleep for full interval
+        assert clock.sleeps == [1.0]
         
-        # Test 2: Second call should not sleep because time difference > min_interval
-        mock_sleep.reset_mock()
-        mock_time.side_effect = [1.5, 2.0]  # More than 1 second apart
+        # More than min_interval later: no wait
+        clock.now += 1.5
         transcriber._respect_rate_limit('assemblyai')
-        mock_sleep.assert_not_called()
-
-
-def mock_open(read_data):
-    """Helper function to mock file open"""
-    mock_file = Mock()
-    mock_file.read.return_value = read_data
-    mock_file.__enter__ = Mock(return_value=mock_file)
-    mock_file.__exit__ = Mock(return_value=None)
-    return Mock(return_value=mock_file)
+        assert clock.sleeps == [1.0]
+        
+        # Back-to-back call: waits only for the rest of the interval
+        clock.now += 0.25
+        transcriber._respect_rate_limit('assemblyai')
+        assert clock.sleeps == [1.0, 0.75]
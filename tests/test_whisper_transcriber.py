@@ -0,0 +1,67 @@
+import pytest
+import requests
+import requests_mock
+from src.models.whisper_transcriber import WhisperTranscriber
+
+
+# All Whisper API traffic goes through requests-mock
+pytestmark = pytest.mark.no_network
+
+_WHISPER_URL = "https://api.openai.com/v1/audio/transcriptions"
+
+
+@pytest.fixture
+def http_adapter():
+    """requests-mock transport standing in for the Whisper API"""
+    return requests_mock.Adapter()
+
+
+@pytest.fixture
+def whisper(http_adapter, monkeypatch):
+    """Whisper transcriber with an API key whose session goes through the mock transport"""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test_key')
+    session = requests.Session()
+    session.mount('https://', http_adapter)
+    return WhisperTranscriber(session=session)
+
+
+@pytest.fixture
+def audio_path(tmp_path):
+    """Small audio file to upload"""
+    path = tmp_path / "voice.ogg"
+    path.write_bytes(b'fake_audio')
+    return str(path)
+
+
+class TestWhisperTranscriber:
+    """Test cases for WhisperTranscriber class"""
+    
+    def test_init_without_api_key(self, monkeypatch):
+        """Test that Whisper is unavailable without an API key"""
+        monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+        
+        whisper = WhisperTranscriber()
+        
+        assert not whisper.available
+        assert whisper.transcribe_audio('/tmp/unused.ogg') is None
+    
+    @pytest.mark.parametrize("status,body,expected_text,still_available", [
+        (200, {'text': ' Hello world '}, "Hello world", True),
+        (200, {'text': '   '}, None, True),
+        (400, {'error': {'message': 'Invalid file format'}}, None, True),
+        (403, {'error': {'code': 'model_not_found'}}, None, False),
+    ], ids=["success", "empty_transcript", "api_error", "model_not_found"])
+    def test_transcribe_audio(self, whisper, http_adapter, audio_path, status, body, expected_text, still_available):
+        """Test how each Whisper API response maps to a transcription result"""
+        http_adapter.register_uri('POST', _WHISPER_URL, status_code=status, json=body)
+        
+        result = whisper.transcribe_audio(audio_path)
+        
+        if expected_text is None:
+            assert result is None
+        else:
+            assert result.text == expected_text
+            assert result.service == "whisper"
+            assert 0.0 <= result.confidence <= 1.0
+        assert whisper.available == still_available
+        assert http_adapter.last_request.headers['Authorization'] == 'Bearer test_key'